@@ -1,15 +1,16 @@
 """Container classes."""
 from pathlib import Path
-from typing import Any, Sequence, Optional, Union
-import abc
+from typing import Any, Dict, Sequence, Optional, Union
 
 from configparseradv.configparser import ConfigParserAdv
 from toolkit.logger import get_logger
 
-class Container(metaclass=abc.ABCMeta):
+from .loaders import kwargs_from_config
+
+class Container:
     """Creates a container abstract class.
 
-    Abstract methods to implement:
+    Abstract methods to implement (checked when the subclass is defined):
 
     - `load_data`
 
@@ -19,6 +20,8 @@ class Container(metaclass=abc.ABCMeta):
       config: configuration.
       log: logging system.
       _data: open the data as required.
+      _loader_kwargs: cached loader keyword arguments per section.
+      _dtype_index: cached sections for each data type.
     """
     log = get_logger(__name__, filename=__package__+'.log')
 
@@ -34,53 +37,76 @@ class Container(metaclass=abc.ABCMeta):
           config_file: optional; configuration file name.
           config: optional; `ConfigParserAdv` object.
         """
-        # Store name
-        self.name = name
         self._data = {}
-
+        self.clear_cache()
+        if config_file is not None:
+            config_file = Path(config_file).expanduser()
+
+        self.config = self._resolve_config(config_file, config,
+                                           default_section)
+        self.name = self._resolve_name(name, default_section)
+        self.config_file = self._resolve_config_file(config_file)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.load_data is Container.load_data:
+            raise TypeError(f'{cls.__name__} must implement load_data')
+
+    def _resolve_config(self,
+                        config_file: Optional[Path],
+                        config: Optional[ConfigParserAdv],
+                        default_section: str) -> ConfigParserAdv:
+        """Load, assign or create the configuration.
+
+        A missing configuration file is skipped by the parser, so the
+        configuration only has the values in `config` (if given).
+        """
         if config_file is not None:
-            self.config_file = Path(config_file).expanduser()
-
-            # Load configuration
-            if self.config_file.is_file():
-                self.log.info('Loading config file: %s', self.config_file)
-                self.load_config(config_file, update_from=config,
-                                 default_section=default_section)
-                self.log.debug('Configuration file loaded')
-            else:
-                self.config = ConfigParserAdv(default_section=default_section)
-
-            # Update name
-            if name is None and 'name' in self.config[default_section]:
-                self.name = self.config[default_section]['name']
-            elif name is not None:
-                self.config[default_section]['name'] = name
-            else:
-                self.log.warning('Could not determine name')
-        elif config is not None:
-            self.config = config
+            self.log.info('Loading config file: %s', config_file)
+            self.load_config(config_file, update_from=config,
+                             default_section=default_section)
+            self.log.debug('Configuration file loaded')
+            return self.config
+
+        if config is not None:
             self.log.info('Configuration assigned')
+            return config
+
+        return ConfigParserAdv(default_section=default_section)
+
+    def _resolve_name(self,
+                      name: Optional[str],
+                      default_section: str) -> Optional[str]:
+        """Store `name` in the configuration or read it from there."""
+        if name is not None:
+            self.config[default_section]['name'] = name
+            return name
+        if 'name' in self.config[default_section]:
+            return self.config[default_section]['name']
+
+        self.log.warning('Could not determine name')
+        return None
+
+    def _resolve_config_file(self,
+                             config_file: Optional[Path]) -> Optional[Path]:
+        """Return `config_file` or a file name built from the name."""
+        if config_file is not None:
+            return config_file
+        if self.name is not None:
+            return Path(f'{self.name}.cfg')
 
-            # Update name
-            if name is None and 'name' in config[default_section]:
-                self.name = config[default_section]['name']
-                self.config_file = Path(f'{name}.cfg')
-            elif name is not None:
-                self.config_file = Path(f'{name}.cfg')
-                self.config[default_section]['name'] = name
-            else:
-                self.log.warning('Could not determine name and config file')
-        else:
-            self.config = ConfigParserAdv(default_section=default_section)
+        self.log.warning('Could not determine config file name')
+        return None
+
+    def clear_cache(self) -> None:
+        """Reset the values cached from the configuration.
 
-            # Update name
-            if name is None:
-                self.log.warning('Could not determine config file name')
-                self.config_file = None
-            else:
-                self.config_file = Path(f'{name}.cfg')
+        It is called by `update_config`, `copy_config` and `load_config`.
+        Call it after editing `config` directly.
+        """
+        self._loader_kwargs = {}
+        self._dtype_index = None
 
-    @abc.abstractmethod
     def load_data(self,
                   section: str,
                   file_name: Optional[Path] = None):
@@ -92,24 +118,45 @@ class Container(metaclass=abc.ABCMeta):
         """Update config `section` with options and values in `kwargs`"""
         if section not in self.config:
             self.log.info('Adding section %s', section)
-            new_vals = {f'{key}': f'{val}' for key, vals in kwargs.items()}
+            new_vals = {f'{key}': f'{val}' for key, val in kwargs.items()}
             self.config[section] = new_vals
         else:
             self.log.info('Updating section %s', section)
             for key, val in kwargs.items():
                 self.config[section][key] = str(val)
+        self.clear_cache()
 
     def copy_config(self, section: str, new_section: str):
         """Copy config section ignoring defaults."""
         self.config.copy_section(section, new_section, ignore_default=True)
+        self.clear_cache()
+
+    def loader_kwargs(self, section: str, base: str = 'loader') -> Dict:
+        """Keyword arguments for the loader of `section`.
+
+        The keywords are read with `kwargs_from_config` the first time and
+        cached. The cache is reset by `clear_cache`, which is called by
+        `update_config`, `copy_config` and `load_config`.
+
+        Args:
+          section: data section.
+          base: optional; look for options that starts with this string.
+        """
+        key = (section, base)
+        if key not in self._loader_kwargs:
+            self._loader_kwargs[key] = kwargs_from_config(self.config[section],
+                                                          base=base)
+        return dict(self._loader_kwargs[key])
 
     def __getitem__(self, section: str):
-        if section not in self._data:
+        try:
+            return self._data[section]
+        except KeyError:
             self.load_data(section)
-        return self._data[section]
+            return self._data[section]
 
     def __setitem__(self, section: str, value: Any):
-        self[section] = value
+        self._data[section] = value
 
     def load_data_from_keys(self,
                             sections: Sequence[str],
@@ -145,6 +192,7 @@ class Container(metaclass=abc.ABCMeta):
         self.config.read(config_file)
         if update_from is not None:
             self.config.read_dict(update_from)
+        self.clear_cache()
 
     def write(self, filename: Optional[Path] = None) -> None:
         """Write configuration file to disk."""
@@ -159,13 +207,18 @@ class Container(metaclass=abc.ABCMeta):
             self.config.write(fl)
 
     def get_data_sections(self, dtypes: Sequence) -> Sequence:
-        """Return the sections in configuration that have data."""
-        sections = []
-        for section, cfg in self.config.items():
-            if 'type' not in cfg:
-                continue
-            elif cfg['type'] in dtypes:
-                sections.append(section)
-
-        return sections
+        """Return the sections in configuration that have data.
 
+        Sections are grouped by type in the order of `dtypes`. The index of
+        sections per type is built on the first call and reset with the
+        other cached values.
+        """
+        if self._dtype_index is None:
+            self._dtype_index = {}
+            for section, cfg in self.config.items():
+                if 'type' not in cfg:
+                    continue
+                self._dtype_index.setdefault(cfg['type'], []).append(section)
+
+        return [section for dtype in dtypes
+                for section in self._dtype_index.get(dtype, [])]
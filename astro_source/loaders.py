@@ -1,5 +1,15 @@
 """Data loading functions."""
+from functools import lru_cache
 from typing import Any, Dict
+import re
+
+# Config getter for each loader keyword type
+_DISPATCH = {
+    'int': 'getint',
+    'float': 'getfloat',
+    'bool': 'getboolean',
+    'quantity': 'getquantity',
+}
 
 def load_data_by_type(file_name: 'pathlib.Path',
                       dtype: str,
@@ -10,12 +20,19 @@ def load_data_by_type(file_name: 'pathlib.Path',
     Args:
       file_name: data file name.
       dtype: data type.
-      classes: dictionary relating each type to an object.
+      loaders: dictionary relating each type to an object.
       kwargs: optional; additional arguments for loader function.
     """
-    if dtype not in loaders:
-        raise TypeError(f'Type {dtype} does not exist')
-    return loaders[dtype](file_name, **kwargs)
+    try:
+        loader = loaders[dtype]
+    except KeyError as exc:
+        raise TypeError(f'Type {dtype} does not exist') from exc
+    return loader(file_name, **kwargs)
+
+@lru_cache(maxsize=None)
+def _key_pattern(base: str) -> re.Pattern:
+    """Compiled pattern for `base_keyword` and `base_keyword_type` options."""
+    return re.compile(rf'^{re.escape(base)}_(?P<name>.+?)(?P<type>_type)?$')
 
 def kwargs_from_config(config: 'configparseradv.configparser.ConfigParserAdv',
                        base: str = 'loader') -> Dict:
@@ -40,30 +57,28 @@ def kwargs_from_config(config: 'configparseradv.configparser.ConfigParserAdv',
 
     Args:
       config: config parser proxy.
-      base: optional; look for options that starts with this string.
+      base: optional; look for options that starts with `base_`.
     """
+    key_re = _key_pattern(base)
     kwargs = {}
     for key in config:
-        if key.startswith(base) and not key.endswith('type'):
-            # Check for type
-            if key + '_type' in config:
-                dtype = config[key + '_type']
-            else:
-                dtype = None
+        # Split key
+        match = key_re.match(key)
+        if match is None or match['type'] or match['name'] == 'type':
+            continue
+        newkey = match['name']
 
-            # Split key
-            newkey = '_'.join(key.split('_')[1:])
+        # Check for type
+        if key + '_type' in config:
+            dtype = config[key + '_type']
+        else:
+            dtype = None
 
-            # Assign value
-            if dtype == 'int':
-                kwargs[newkey] = config.getint(key)
-            elif dtype == 'float':
-                kwargs[newkey] = config.getfloat(key)
-            elif dtype == 'bool':
-                kwargs[newkey] = config.getboolean(key)
-            elif dtype == 'quantity':
-                kwargs[newkey] = config.getquantity(key)
-            else:
-                kwargs[newkey] = config[key]
+        # Assign value
+        getter = _DISPATCH.get(dtype)
+        if getter is not None:
+            kwargs[newkey] = getattr(config, getter)(key)
+        else:
+            kwargs[newkey] = config[key]
 
     return kwargs
@@ -1,20 +1,57 @@
 """Register classes to open data.
 
-The `REGISTERED_CLASSES` dictionary stores functions/classes to open data.
+The `REGISTERED_CLASSES` dictionary stores functions/classes to open data,
+and `REGISTERED_CLASS_NAMES` stores a tuple with its keys.
 
 From:
 http://scottlobdell.me/2015/08/using-decorators-python-automatic-registration/
 """
-from spectral_cube import SpectralCube
+from importlib.util import find_spec
+
 from astropy.io import fits
 
+def read_spectral_cube(file_name: 'pathlib.Path',
+                       **kwargs) -> 'spectral_cube.SpectralCube':
+    """Read a `SpectralCube`.
+
+    The `spectral_cube` package is imported on the first call.
+
+    Args:
+      file_name: cube file name.
+      kwargs: optional; additional arguments for `SpectralCube.read`.
+    """
+    from spectral_cube import SpectralCube
+    return SpectralCube.read(file_name, **kwargs)
+
+def open_hdf5_cube(file_name: 'pathlib.Path',
+                   dataset: str = 'cube',
+                   **kwargs) -> 'h5py.Dataset':
+    """Open a dataset from an HDF5 file.
+
+    The `h5py` package is imported on the first call. The file stays open
+    and can be closed with `dataset.file.close()`.
+
+    Args:
+      file_name: HDF5 file name.
+      dataset: optional; name of the dataset in the file.
+      kwargs: optional; additional arguments for `h5py.File` (e.g. the
+        chunk cache options `rdcc_nbytes` and `rdcc_nslots`).
+    """
+    import h5py
+    return h5py.File(file_name, 'r', **kwargs)[dataset]
+
 # Global values
 REGISTERED_CLASSES = {
-    'spectral_cube': SpectralCube.read,
+    'spectral_cube': read_spectral_cube,
     'fits_file': fits.open,
 }
+if find_spec('h5py') is not None:
+    REGISTERED_CLASSES['hdf5_cube'] = open_hdf5_cube
+REGISTERED_CLASS_NAMES = tuple(REGISTERED_CLASSES)
 
 def register_class(cls):
     """Register class decorator."""
+    global REGISTERED_CLASS_NAMES
     REGISTERED_CLASSES[cls.__name__.lower()] = cls
+    REGISTERED_CLASS_NAMES = tuple(REGISTERED_CLASSES)
     return cls
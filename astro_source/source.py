@@ -1,15 +1,18 @@
 """Classes for managing and creating astro sources."""
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
-from typing import Optional, Sequence, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 import argparse
+import errno
 
-from astropy.coordinates import SkyCoord
 from configparseradv.configparser import ConfigParserAdv
 from toolkit.logger import get_logger
 import astropy.units as u
 
 from .container import Container
-from .loaders import load_data_by_type, kwargs_from_config
+from .loaders import load_data_by_type
+from . import register
 from .register import REGISTERED_CLASSES
 
 class Source(Container):
@@ -19,22 +22,28 @@ class Source(Container):
       name: name of the source.
       config_file: configuration file name.
       config: configuration file of the source.
-      subsources: region subsources (if any).
+      subsources: region subsources (if any), loaded on first access.
       log: logging manager.
       _data: the data belonging to the source.
+      _quantity_cache: cached quantities per (section, option).
+      _types: cached lowercase data type per section.
     """
     log = get_logger(__name__, filename=__package__+'.log')
 
     def __init__(self,
                  name: Optional[str] = None,
                  config_file: Optional[Union[Path, str]] = None,
-                 config: Optional[ConfigParserAdv] = None):
+                 config: Optional[ConfigParserAdv] = None,
+                 preload: bool = False):
         """Creates a new Source.
 
+        Data are loaded when requested unless `preload` is set.
+
         Args:
           name: optional; the name of the source.
           config_file: optional; configuration file name.
           config: optional; `ConfigParserAdv` object.
+          preload: optional; load all the data at initialization.
         """
         # Initialize
         if name is not None:
@@ -43,20 +52,19 @@ class Source(Container):
             self.log.info('Initializing source from configuration')
         super().__init__(name, config_file=config_file, config=config,
                          default_section='INFO')
-
-        # Initiate subsources
-        self.subsources = {}
-        self.load_subsources()
+        if preload:
+            self.load_all_data()
 
     def __str__(self):
         """String representation."""
         lines = [f'{self.name}', '-'*len(self.name)]
         for opt, val in self.config.items('INFO'):
             lines.append(f'{opt} = {val}')
-        if self.subsources:
+        subsources = self.__dict__.get('subsources')
+        if subsources:
             lines.append('Subsources:')
-            lines.append(','.join(f' {val.name} (key)'
-                                  for key, val in self.subsources.items()))
+            lines.append(','.join(f' {val.name} ({key})'
+                                  for key, val in subsources.items()))
         if self._data:
             lines.append('Loaded data:')
             for key in self._data:
@@ -79,24 +87,76 @@ class Source(Container):
 
         return cls(config=config)
 
+    @classmethod
+    def from_files(cls,
+                   config_files: Sequence[Union[Path, str]]) -> List['Source']:
+        """Create a source from each configuration file.
+
+        Args:
+          config_files: configuration file names.
+        """
+        return [cls(config_file=Path(fname).expanduser())
+                for fname in config_files]
+
     def get_quantity(self, opt, section='INFO'):
-        """Get value in config as quantity."""
-        return self.config.getquantity(section, opt, fallback=None)
+        """Get value in config as quantity.
+
+        The parsed values are cached and a copy is returned. The cache is
+        reset by `clear_cache`, which is called by `update_config`,
+        `copy_config` and `load_config`, but not when `config` is edited
+        directly.
+        """
+        value = self._cached_quantity(opt, section)
+        if value is None:
+            return None
+        return value.copy()
+
+    def _cached_quantity(self, opt, section):
+        """Get the cached quantity (shared, do not modify)."""
+        key = (section, opt)
+        try:
+            return self._quantity_cache[key]
+        except KeyError:
+            value = self.config.getquantity(section, opt, fallback=None)
+            self._quantity_cache[key] = value
+            return value
+
+    def get_value(self, opt, unit, section='INFO') -> Optional[float]:
+        """Get value in config converted to `unit` (`None` if missing)."""
+        value = self._cached_quantity(opt, section)
+        if value is None:
+            return None
+        return value.to_value(unit)
 
     @property
     def distance(self):
         return self.get_quantity('distance')
 
+    def distance_value(self, unit) -> Optional[float]:
+        """Distance value in `unit`."""
+        return self.get_value('distance', unit)
+
     @property
     def luminosity(self):
         return self.get_quantity('luminosity')
 
+    def luminosity_value(self, unit) -> Optional[float]:
+        """Luminosity value in `unit`."""
+        return self.get_value('luminosity', unit)
+
     @property
     def vlsr(self):
         return self.get_quantity('vlsr')
 
-    @property
+    @cached_property
     def position(self):
+        """Source position.
+
+        The position is cached and reset by `clear_cache`, which is called by
+        `update_config`, `copy_config` and `load_config`, but not when
+        `config` is edited directly.
+        """
+        from astropy.coordinates import SkyCoord
         ra = self.config['INFO']['ra']
         dec = self.config['INFO']['dec']
         frame = self.config.get('INFO', 'frame', fallback='icrs')
@@ -110,22 +170,66 @@ class Source(Container):
     def dec(self):
         return self.position.dec
 
+    def clear_cache(self) -> None:
+        """Reset the values cached from the configuration."""
+        super().clear_cache()
+        self._quantity_cache = {}
+        self._types = {}
+        self.__dict__.pop('position', None)
+
     def get_type(self, section: str) -> str:
         """Get the type of data.
 
+        The lowercase type is cached until `clear_cache` is called.
+
         Args:
           section: the data key.
         """
-        return self.config[section]['type'].lower()
+        try:
+            return self._types[section]
+        except KeyError:
+            dtype = self._types[section] = self.config[section]['type'].lower()
+            return dtype
+
+    @cached_property
+    def subsources(self) -> Dict[str, 'SubSource']:
+        """Subsources in the configuration, loaded on first access."""
+        return self._read_subsources()
 
     def load_subsources(self) -> None:
-        """Load the subsources in `Source` configuration."""
-        for section, conf in self.config.items():
-            if not conf.get('type', fallback='') == 'subsource':
-                continue
+        """Load (or reload) the subsources in `Source` configuration."""
+        self.subsources = self._read_subsources()
+
+    def _read_subsources(self) -> Dict[str, 'SubSource']:
+        """Create the subsources from the configuration sections.
 
-            self.subsources[section] = SubSource.from_config_proxy(conf,
-                                                                   name=section)
+        The positions of all the subsources in the same frame are converted
+        with a single `SkyCoord` call.
+        """
+        from astropy.coordinates import SkyCoord
+        sections = [section for section in self.config.sections()
+                    if self.config.get(section, 'type', raw=True,
+                                       fallback='') == 'subsource']
+        parsed = {}
+        coords = {}
+        for section in sections:
+            conf = self.config[section]
+            info, position = SubSource.split_info(conf)
+            parsed[section] = (conf.get('name', fallback=section), info)
+            if 'ra' in position and 'dec' in position:
+                group = coords.setdefault(position['frame'], ([], [], []))
+                group[0].append(section)
+                group[1].append(position['ra'])
+                group[2].append(position['dec'])
+
+        # Positions
+        for frame, (sections, ras, decs) in coords.items():
+            positions = SkyCoord(ra=ras, dec=decs, frame=frame)
+            for i, section in enumerate(sections):
+                parsed[section][1]['position'] = positions[i]
+
+        return {section: SubSource(name, **info)
+                for section, (name, info) in parsed.items()}
 
     def load_data(self, section: str,
                   file_name: Optional[Union[Path, str]] = None,
@@ -136,6 +240,25 @@ class Source(Container):
         which type of data it has to load. The data information (e.g. file
         name) has to be in the source configuration file.
 
+        Args:
+          section: the data section to be loaded.
+          file_name: optional; overwrites the config file name.
+          kwargs: optional; additional arguments for loader function.
+        """
+        self._data[section] = self._read_data(section, file_name=file_name,
+                                              **kwargs)
+
+        # Update config
+        if file_name is not None:
+            super().load_data(section, file_name=file_name)
+
+    def _read_data(self, section: str,
+                   file_name: Optional[Union[Path, str]] = None,
+                   **kwargs) -> Any:
+        """Load the data of `section` and return it.
+
+        Neither the configuration nor the loaded data are modified.
+
         Args:
           section: the data section to be loaded.
           file_name: optional; overwrites the config file name.
@@ -150,27 +273,85 @@ class Source(Container):
             raise ValueError(f'Could not load data for {section}')
 
         # Load data
-        dtype = self.config[section]['type'].lower()
-        kwargs_load = kwargs_from_config(self.config[section])
+        dtype = self.get_type(section)
+        kwargs_load = self.loader_kwargs(section)
         kwargs_load.update(kwargs)
-        self._data[section] = load_data_by_type(data_file,
-                                                dtype,
-                                                REGISTERED_CLASSES,
-                                                **kwargs_load)
+        try:
+            return load_data_by_type(data_file, dtype, REGISTERED_CLASSES,
+                                     **kwargs_load)
+        except FileNotFoundError as exc:
+            if exc.filename is None or Path(exc.filename) != data_file:
+                raise
+            raise FileNotFoundError(errno.ENOENT,
+                                    f'Data file for {section} not found',
+                                    str(data_file)) from exc
+
+    def load_data_from_keys(self,
+                            sections: Sequence[str],
+                            file_names: Sequence[Path],
+                            max_workers: Optional[int] = None) -> None:
+        """Load all the data in each file and store.
+
+        The data are stored and the file names are written in the
+        configuration in order, after each file is read, so a failed load
+        leaves the later sections untouched.
 
-        # Update config
-        super().load_data(section, file_name=file_name)
+        Args:
+          sections: list of sections for each file.
+          file_names: list of files to load.
+          max_workers: optional; read the files in this many threads
+            (default sequential). Only use it with thread-safe loaders.
+        """
+        to_load = list(zip(sections, file_names))
+        for (section, fname), data in zip(to_load,
+                                          self._iter_read(to_load,
+                                                          max_workers)):
+            self._data[section] = data
+            super().load_data(section, file_name=fname)
 
-    def load_all_data(self):
-        """Load all the data in the configuration file."""
-        for section in self.config.sections():
-            if section == 'INFO' or 'type' not in self.config[section]:
-                continue
-            elif self.config[section]['type'] == 'subsource':
+    def load_all_data(self, max_workers: Optional[int] = None) -> None:
+        """Load all the data in the configuration file.
+
+        Args:
+          max_workers: optional; read the files in this many threads
+            (default sequential). Only use it with thread-safe loaders.
+        """
+        type_map = {section: self.config.get(section, 'type', raw=True,
+                                             fallback=None)
+                    for section in self.config.sections()}
+        sections = []
+        for section, dtype in type_map.items():
+            if section == 'INFO' or dtype is None or dtype == 'subsource':
                 continue
-            else:
-                self.logger.info(f'Loading: {section}')
-                self.load_data(section)
+            self.log.info('Loading: %s', section)
+            sections.append(section)
+
+        to_load = [(section, None) for section in sections]
+        for section, data in zip(sections,
+                                 self._iter_read(to_load, max_workers)):
+            self._data[section] = data
+
+    def _iter_read(self,
+                   to_load: Sequence[Tuple[str, Optional[Path]]],
+                   max_workers: Optional[int] = None):
+        """Read the data of each `(section, file_name)` and yield it in order.
+
+        Args:
+          to_load: sections and file names (`None` to use the configuration).
+          max_workers: optional; read the files in this many threads
+            (default sequential).
+        """
+        if max_workers is None or max_workers <= 1:
+            for section, fname in to_load:
+                yield self._read_data(section, file_name=fname)
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._read_data, section,
+                                       file_name=fname)
+                       for section, fname in to_load]
+            for future in futures:
+                yield future.result()
 
     def load_config(self,
                     config_file: Path,
@@ -191,17 +372,19 @@ class Source(Container):
 
     def write(self, filename: Optional[Path] = None) -> None:
         """Write configuration file to disk."""
-        # Store subsources in config
-        if self.subsources:
-            for key, val in self.subsources.items():
+        # Store subsources in config (only if they were loaded)
+        subsources = self.__dict__.get('subsources')
+        if subsources:
+            for key, val in subsources.items():
                 if key not in self.config:
                     self.config[key] = val.to_dict()
+            self.clear_cache()
 
         # Write
         super().write(filename=filename)
 
     def get_data_sections(self) -> Sequence:
-        return super().get_data_sections(tuple(REGISTERED_CLASSES.keys()))
+        return super().get_data_sections(register.REGISTERED_CLASS_NAMES)
 
 class SubSource(object):
     """Class for storing individual source information.
@@ -217,6 +400,7 @@ class SubSource(object):
       name: subsource name.
       info: source information.
     """
+    __slots__ = ('name', 'info')
 
     def __init__(self, name: str, **info):
         self.name = name
@@ -248,6 +432,24 @@ class SubSource(object):
         """
         if name is None:
             name = data.pop('name', name)
+        info, position = cls.split_info(data)
+        if 'ra' in position and 'dec' in position:
+            from astropy.coordinates import SkyCoord
+            info['position'] = SkyCoord(**position)
+
+        return cls(name, **info)
+
+    @staticmethod
+    def split_info(data: dict) -> Tuple[dict, dict]:
+        """Separate the position values from the rest of the information.
+
+        Args:
+          data: configuration parser proxy or dictionary.
+
+        Returns:
+          A dictionary with the subsource information without the position,
+          and a dictionary with the `ra`, `dec` and `frame` values.
+        """
         ignore_keys = ['type', 'name']
         info = {}
         position = {'frame': 'icrs'}
@@ -261,10 +463,7 @@ class SubSource(object):
             else:
                 info[key] = val
 
-        if 'ra' in position and 'dec' in position:
-            info['position'] = SkyCoord(**position)
-
-        return cls(name, **info)
+        return info, position
 
     @property
     def position(self):
@@ -276,7 +475,12 @@ class SubSource(object):
         props = {'name': self.name, 'type': 'subsource'}
         for key, val in self.info.items():
             if key == 'position':
-                props['ra'], props['dec'] = val.to_string('hmsdms').split()
+                props['ra'] = val.spherical.lon.to_string(unit=u.hourangle,
+                                                          sep='hms', pad=True)
+                props['dec'] = val.spherical.lat.to_string(unit=u.deg,
+                                                           sep='dms',
+                                                           alwayssign=True,
+                                                           pad=True)
                 props['frame'] = val.frame.name
             elif hasattr(val, 'unit'):
                 props[key] = f'{val.value} {val.unit}'
@@ -286,7 +490,11 @@ class SubSource(object):
         return props
 
 class LoadSource(argparse.Action):
-    """Load a source in from config."""
+    """Load a source in from config.
+
+    If a `Source` with the same configuration file was already loaded into the
+    namespace (e.g. by another option), it is reused.
+    """
 
     def __init__(self,
                  option_strings: Sequence[str],
@@ -299,7 +507,13 @@ class LoadSource(argparse.Action):
         super().__init__(option_strings, dest, **defaults)
 
     def __call__(self, parser, namespace, values, option_string=None):
-        source = Source(config_file=Path(values[0]).expanduser())
+        config_file = Path(values[0]).expanduser()
+        for source in vars(namespace).values():
+            if (isinstance(source, Source) and
+                source.config_file == config_file):
+                break
+        else:
+            source = Source(config_file=config_file)
         setattr(namespace, self.dest, source)
 
 class LoadSources(argparse.Action):
@@ -316,5 +530,5 @@ class LoadSources(argparse.Action):
         super().__init__(option_strings, dest, **defaults)
 
     def __call__(self, parser, namespace, vals, option_string=None):
-        sources = [Source(config_file=Path(val).expanduser()) for val in vals]
+        sources = Source.from_files(vals)
         setattr(namespace, self.dest, sources)